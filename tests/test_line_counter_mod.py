@@ -0,0 +1,251 @@
+from typing import List
+
+import cv2
+import numpy as np
+import pytest
+
+from supervision.geometry.dataclasses import Point, Vector
+from supervision.tools.detections import Detections
+
+from third_party.Line_counter import line_counter_mod
+from third_party.Line_counter.line_counter_mod import LineCounter, LineCounterAnnotator
+
+CLASS_NAMES_DICT = {2: "car", 3: "motorcycle", 5: "bus", 7: "truck"}
+STARTS = [Point(x=0, y=200), Point(x=500, y=0), Point(x=0, y=0)]
+ENDS = [Point(x=640, y=220), Point(x=520, y=480), Point(x=640, y=640)]
+
+
+@pytest.fixture(params=["numba", "numpy"])
+def counting_path(request, monkeypatch):
+    if request.param == "numba" and not line_counter_mod.HAS_NUMBA:
+        pytest.skip("numba is not installed")
+    if request.param == "numpy":
+        monkeypatch.setattr(line_counter_mod, "HAS_NUMBA", False)
+    return request.param
+
+
+def make_detections(xyxy, class_id, tracker_id) -> Detections:
+    return Detections(
+        xyxy=np.array(xyxy, dtype=np.float32).reshape(-1, 4),
+        confidence=np.ones(len(class_id), dtype=np.float32),
+        class_id=np.array(class_id),
+        tracker_id=np.array(tracker_id, dtype=object),
+    )
+
+
+def make_line_counter() -> LineCounter:
+    line_counter = LineCounter(
+        start=[Point(x=0, y=200), Point(x=500, y=0)],
+        end=[Point(x=640, y=220), Point(x=520, y=480)],
+        class_id=list(CLASS_NAMES_DICT),
+        class_name_dict=CLASS_NAMES_DICT,
+    )
+    # one car crossing the first line downwards, so the labels hold non-zero counts
+    for y in (150, 250):
+        line_counter.update(detections=make_detections([100, y, 120, y + 20], [2], [1]))
+    return line_counter
+
+
+def make_random_frames(seed: int, n_trackers: int = 150, n_frames: int = 40) -> List[Detections]:
+    rng = np.random.default_rng(seed)
+    position = rng.integers(0, 640, size=(n_trackers, 2))
+    class_id = rng.choice(list(CLASS_NAMES_DICT), size=n_trackers)
+    frames = []
+    for _ in range(n_frames):
+        position += rng.integers(-15, 16, size=position.shape)
+        ids = np.flatnonzero(rng.random(n_trackers) < 0.8)
+        # whole pixel boxes keep the float32 cross product of Vector.is_in exact
+        xyxy = np.concatenate([position[ids] - 10, position[ids] + 10], axis=1)
+        tracker_id = [int(i) + 1 if rng.random() > 0.05 else None for i in ids]
+        frames.append(make_detections(xyxy, class_id[ids], tracker_id))
+    return frames
+
+
+def count_with_vector_is_in(frames: List[Detections]):
+    """
+    The per detection, per line update LineCounter had before it was vectorized.
+    """
+    vectors = [Vector(start=start, end=end) for start, end in zip(STARTS, ENDS)]
+    tracker_state_batch = [{} for _ in vectors]
+    tracker_line = {}
+    in_count_dict_batch = [{name: 0 for name in CLASS_NAMES_DICT.values()} for _ in vectors]
+    out_count_dict_batch = [{name: 0 for name in CLASS_NAMES_DICT.values()} for _ in vectors]
+    for detections in frames:
+        for xyxy, _, class_id, tracker_id in detections:
+            if tracker_id is None:
+                continue
+            x1, y1, x2, y2 = xyxy
+            mean_anchor = Point(x=(x1 + x2) / 2, y=(y1 + y2) / 2)
+            for id, vector in enumerate(vectors):
+                tracker_state = vector.is_in(point=mean_anchor)
+                if tracker_id not in tracker_state_batch[id]:
+                    tracker_state_batch[id][tracker_id] = tracker_state
+                    tracker_line[tracker_id] = [class_id]
+                    continue
+                if tracker_state_batch[id][tracker_id] == tracker_state:
+                    continue
+                tracker_state_batch[id][tracker_id] = tracker_state
+                tracker_line[tracker_id].append(id)
+                count_dict_batch = in_count_dict_batch if tracker_state else out_count_dict_batch
+                count_dict_batch[id][CLASS_NAMES_DICT[class_id]] += 1
+    return tracker_line, in_count_dict_batch, out_count_dict_batch
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_update_matches_vector_is_in(counting_path, seed):
+    frames = make_random_frames(seed)
+    line_counter = LineCounter(
+        start=STARTS, end=ENDS, class_id=list(CLASS_NAMES_DICT), class_name_dict=CLASS_NAMES_DICT
+    )
+    for detections in frames:
+        line_counter.update(detections=detections)
+
+    tracker_line, in_count_dict_batch, out_count_dict_batch = count_with_vector_is_in(frames)
+    # more trackers than the initial slots, so the state grew on the way
+    assert len(line_counter.tracker_line) > line_counter_mod.INITIAL_TRACKER_SLOTS
+    assert line_counter.counts.sum() > 0
+    assert line_counter.tracker_line == tracker_line
+    assert line_counter.in_count_dict_batch == in_count_dict_batch
+    assert line_counter.out_count_dict_batch == out_count_dict_batch
+
+
+def test_update_keeps_tracker_state_per_shard(counting_path):
+    line_counter = LineCounter(
+        start=[Point(x=0, y=100)],
+        end=[Point(x=200, y=100)],
+        class_id=list(CLASS_NAMES_DICT),
+        class_name_dict=CLASS_NAMES_DICT,
+        n_shards=2,
+    )
+    # tracker 1 of shard 0 crosses the line, tracker 1 of shard 1 stays below it
+    for shard_id, ys in ((0, (50, 150)), (1, (150, 150))):
+        for y in ys:
+            detections = make_detections([90, y - 10, 110, y + 10], [2], [1])
+            line_counter.update(detections=detections, shard_id=shard_id)
+    assert line_counter.tracker_line_shards == [{1: [2, 0]}, {1: [2]}]
+    assert line_counter.tracker_line is line_counter.tracker_line_shards[0]
+    assert line_counter.counts.sum() == 1
+
+
+def test_counts_sum_shards_without_padding_columns(counting_path):
+    line_counter = LineCounter(
+        start=[Point(x=0, y=100)],
+        end=[Point(x=200, y=100)],
+        class_id=list(CLASS_NAMES_DICT),
+        class_name_dict=CLASS_NAMES_DICT,
+        n_shards=3,
+    )
+    # a truck crossing downwards on every shard
+    for shard_id in range(3):
+        for y in (50, 150):
+            detections = make_detections([90, y - 10, 110, y + 10], [7], [1])
+            line_counter.update(detections=detections, shard_id=shard_id)
+    assert line_counter.counts.shape == (2, 1, len(CLASS_NAMES_DICT))
+    np.testing.assert_array_equal(line_counter.out_counts, [[0, 0, 0, 3]])
+    np.testing.assert_array_equal(line_counter.in_counts, [[0, 0, 0, 0]])
+
+
+def test_reset_forgets_counts_and_trackers(counting_path):
+    line_counter = make_line_counter()
+    assert line_counter.counts.sum() == 1
+
+    line_counter.reset()
+    assert line_counter.counts.sum() == 0
+    assert line_counter.tracker_line == {}
+    # tracker 1 comes back on the other side of the first line, it is new again and not counted
+    line_counter.update(detections=make_detections([100, 150, 120, 170], [2], [1]))
+    assert line_counter.counts.sum() == 0
+    assert line_counter.tracker_line == {1: [2]}
+
+
+def test_update_counts_lines_with_large_coordinates(counting_path):
+    # c = nx * sx + ny * sy is 2.5e9 here, past the int32 range
+    start, end = Point(x=50000, y=0), Point(x=0, y=50000)
+    line_counter = LineCounter(
+        start=[start], end=[end], class_id=list(CLASS_NAMES_DICT), class_name_dict=CLASS_NAMES_DICT
+    )
+    for xy in (24000, 26000):
+        line_counter.update(detections=make_detections([xy - 10, xy - 10, xy + 10, xy + 10], [2], [1]))
+    is_in = Vector(start=start, end=end).is_in(point=Point(x=26000, y=26000))
+    assert line_counter.counts[int(is_in), 0, 0] == 1
+    assert line_counter.counts.sum() == 1
+
+
+def test_update_skips_counts_of_classes_outside_class_id(counting_path):
+    line_counter = LineCounter(
+        start=[Point(x=0, y=100)],
+        end=[Point(x=200, y=100)],
+        class_id=[2, 7],
+        class_name_dict=CLASS_NAMES_DICT,
+    )
+    # a bus (5) and a car (2) both crossing the line
+    for y in (50, 150):
+        line_counter.update(detections=make_detections([[90, y - 10, 110, y + 10]] * 2, [5, 2], [1, 2]))
+    assert line_counter.tracker_line == {1: [5, 0], 2: [2, 0]}
+    assert line_counter.out_count_dict_batch == [{"car": 1, "truck": 0}]
+    assert line_counter.in_count_dict_batch == [{"car": 0, "truck": 0}]
+
+
+def test_update_truncates_fractional_line_endpoints(counting_path):
+    # the line is counted at y = 10 like it is drawn, Vector.is_in would place it at y = 10.9
+    line_counter = LineCounter(
+        start=[Point(x=0, y=10.9)],
+        end=[Point(x=100, y=10.9)],
+        class_id=list(CLASS_NAMES_DICT),
+        class_name_dict=CLASS_NAMES_DICT,
+    )
+    for y in (5, 10.5):
+        line_counter.update(detections=make_detections([40, y - 10, 60, y + 10], [2], [1]))
+    assert line_counter.out_counts[0, 0] == 1
+    assert line_counter.counts.sum() == 1
+
+
+@pytest.mark.parametrize(
+    "annotator_kwargs",
+    [
+        dict(thickness=1, text_thickness=1, text_scale=0.25),
+        dict(),
+        dict(text_padding=0),
+        dict(text_padding=0, text_scale=1.5),
+        dict(text_scale=2.5),
+    ],
+)
+def test_annotate_cached_labels_match_uncached(annotator_kwargs):
+    line_counter = make_line_counter()
+    cached_annotator = LineCounterAnnotator(**annotator_kwargs)
+    rng = np.random.default_rng(0)
+
+    for _ in range(3):
+        background = rng.integers(0, 256, size=(480, 640, 3), dtype=np.uint8)
+        cached_frame = background.copy()
+        uncached_frame = background.copy()
+        cached_annotator.annotate(frame=cached_frame, line_counter=line_counter)
+        LineCounterAnnotator(**annotator_kwargs).annotate(frame=uncached_frame, line_counter=line_counter)
+        np.testing.assert_array_equal(cached_frame, uncached_frame)
+
+
+@pytest.mark.parametrize(
+    "annotator_kwargs, cached",
+    [
+        (dict(thickness=1, text_thickness=1, text_scale=0.25), True),
+        (dict(text_scale=2.5), False),
+    ],
+)
+def test_annotate_reuses_labels_only_when_they_fit_their_background(monkeypatch, annotator_kwargs, cached):
+    put_text_calls = []
+    put_text = cv2.putText
+
+    def counting_put_text(*args, **kwargs):
+        put_text_calls.append(args)
+        return put_text(*args, **kwargs)
+
+    monkeypatch.setattr(cv2, "putText", counting_put_text)
+    line_counter = make_line_counter()
+    annotator = LineCounterAnnotator(**annotator_kwargs)
+
+    annotator.annotate(frame=np.zeros((480, 640, 3), dtype=np.uint8), line_counter=line_counter)
+    assert len(put_text_calls) > 0
+    # same counts and frame shape, cached labels are pasted without drawing any text
+    put_text_calls.clear()
+    annotator.annotate(frame=np.zeros((480, 640, 3), dtype=np.uint8), line_counter=line_counter)
+    assert (len(put_text_calls) == 0) == cached
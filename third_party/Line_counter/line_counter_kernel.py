@@ -0,0 +1,55 @@
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+if HAS_NUMBA:
+    @njit(cache=True, nogil=True, fastmath=True)
+    def _update_kernel(cx, cy, slots, cls_idx, is_new, nx, ny, c, state, counts, crossed):
+        """
+        Side test, state diff and count update of all lines x all detections, in place.
+
+        The GIL is released so that streams updating different LineCounter shards
+        run the kernel concurrently. The in/out counter is selected by indexing
+        counts with the new side instead of branching on it.
+
+        :param cx: np.ndarray : (N,) float32 x of the mean anchors.
+        :param cy: np.ndarray : (N,) float32 y of the mean anchors.
+        :param slots: np.ndarray : (N,) int64 tracker slot of each detection.
+        :param cls_idx: np.ndarray : (N,) int64 count column of each detection.
+        :param is_new: np.ndarray : (N,) bool, True for trackers seen for the first time.
+        :param nx, ny: np.ndarray : (L,) int32 line normals, a point is in when nx * x + ny * y > c.
+        :param c: np.ndarray : (L,) int64 line offsets.
+        :param state: np.ndarray : (L, T // 64) uint64 side bits of every line, bit slot & 63 of word slot >> 6.
+        :param counts: np.ndarray : (2, L, C) int32 out (0) and in (1) counts.
+        :param crossed: np.ndarray : (N, L) bool output, True where a detection crossed a line.
+        """
+        for l in range(nx.shape[0]):
+            for i in range(cx.shape[0]):
+                s = np.float64(nx[l]) * cx[i] + np.float64(ny[l]) * cy[i] > c[l]
+                word = slots[i] >> 6
+                bit = np.uint64(1) << np.uint64(slots[i] & 63)
+                flipped = ((state[l, word] & bit) != np.uint64(0)) != s
+                state[l, word] ^= bit * np.uint64(flipped)
+                changed = flipped & (not is_new[i])
+                crossed[i, l] = changed
+                counts[np.int64(s), l, cls_idx[i]] += np.int32(changed)
+
+    # compile on import instead of on the first video frame
+    _update_kernel(
+        np.zeros(1, dtype=np.float32),
+        np.zeros(1, dtype=np.float32),
+        np.zeros(1, dtype=np.int64),
+        np.zeros(1, dtype=np.int64),
+        np.zeros(1, dtype=np.bool_),
+        np.ones(1, dtype=np.int32),
+        np.zeros(1, dtype=np.int32),
+        np.zeros(1, dtype=np.int64),
+        np.zeros((1, 1), dtype=np.uint64),
+        np.zeros((2, 1, 1), dtype=np.int32),
+        np.zeros((1, 1), dtype=np.bool_),
+    )
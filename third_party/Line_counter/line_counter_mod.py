@@ -1,103 +1,283 @@
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
 
 from supervision.draw.color import Color
-from supervision.geometry.dataclasses import Point, Rect, Vector
+from supervision.geometry.dataclasses import Rect, Vector
 from supervision.tools.detections import Detections
 
+from .line_counter_kernel import HAS_NUMBA
+
+if HAS_NUMBA:
+    from .line_counter_kernel import _update_kernel
+
+
+# bytes of a CPU cache line, shards of counters never share one
+CACHE_LINE_SIZE = 64
+# tracker slots allocated on the first update, doubled whenever they run out,
+# a multiple of 64 so the side bits of every line fill whole uint64 words
+INITIAL_TRACKER_SLOTS = 64
+
+
+def _aligned_zeros(shape: Tuple[int, ...], dtype, alignment: int = CACHE_LINE_SIZE) -> np.ndarray:
+    """
+    Allocate a zero filled array whose data starts on an alignment boundary.
+
+    :param shape: tuple : The shape of the array.
+    :param dtype: The dtype of the array.
+    :param alignment: int : The alignment of the first element in bytes.
+    :return: np.ndarray : The aligned, C-contiguous array.
+    """
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    buffer = np.zeros(nbytes + alignment, dtype=np.uint8)
+    offset = -buffer.ctypes.data % alignment
+    return buffer[offset:offset + nbytes].view(dtype).reshape(shape)
+
+
+class _LineCounterShard:
+    def __init__(self, n_lines: int, counts: np.ndarray):
+        """
+        Tracker state and counters written by a single caller of LineCounter.update.
+
+        :param n_lines: int : The number of lines.
+        :param counts: np.ndarray : (2, L, C_pad) int32 out (0) and in (1) counts of this shard.
+        """
+        self.tracker_line: Dict[int, List[int]] = {}
+        self.counts = counts
+        # side of every line for each tracker, one bit (slot) per tracker_id,
+        # bit slot & 63 of word slot >> 6
+        self.tid_to_slot: Dict[int, int] = {}
+        self.state = np.zeros((n_lines, 0), dtype=np.uint64)
+        self.seen = np.zeros(0, dtype=np.bool_)
+
+    def reset(self):
+        """
+        Forget all trackers of this shard, the counts are reset by the owning LineCounter.
+        """
+        self.tracker_line.clear()
+        self.tid_to_slot.clear()
+        self.state.fill(0)
+        self.seen.fill(False)
+
+    def assign_slot(self, tracker_id: int) -> int:
+        """
+        Slot of tracker_id in the state arrays, new trackers get the next free one.
+
+        :param tracker_id: int : The tracker id of a detection.
+        :return: int : The slot of the tracker.
+        """
+        slot = self.tid_to_slot.get(tracker_id)
+        if slot is None:
+            slot = len(self.tid_to_slot)
+            self.tid_to_slot[tracker_id] = slot
+            if slot >= self.seen.shape[0]:
+                self._grow_state()
+        return slot
+
+    def _grow_state(self):
+        """
+        Double the number of tracker slots, keeping the state of existing trackers.
+        """
+        capacity = self.seen.shape[0]
+        new_capacity = max(2 * capacity, INITIAL_TRACKER_SLOTS)
+        state = np.zeros((self.state.shape[0], new_capacity // 64), dtype=np.uint64)
+        state[:, :capacity // 64] = self.state
+        seen = np.zeros(new_capacity, dtype=np.bool_)
+        seen[:capacity] = self.seen
+        self.state = state
+        self.seen = seen
+
 
 class LineCounter:
-    def __init__(self, start: None, end: None, class_id: None, class_name_dict: None):
+    def __init__(self, start: None, end: None, class_id: None, class_name_dict: None, n_shards: int = 1):
         """
         Initialize a LineCounter object.
 
         :param start: Point : The starting point of the line.
         :param end: Point : The ending point of the line.
+        :param n_shards: int : The number of video streams (threads) that update this counter concurrently.
         """
         self.vector_batch = []
         self.start_points = start
         self.end_points = end
         for i in range(len(self.start_points)):
             self.vector_batch.append(Vector(start=self.start_points[i], end=self.end_points[i]))
-        self.tracker_state: Dict[str, bool] = {}
-        self.tracker_line: Dict[str, int] = {}
-        self.in_count_dict: Dict[str, int] = {}
-        self.out_count_dict: Dict[str, int] = {}
-        self.in_count_dict_batch = []
-        self.out_count_dict_batch = []
-        self.tracker_state_batch = []
         # self.tracker_class_id_dict: Dict[str, int] = {}
         self.in_count: int = 0
         self.out_count: int = 0
         self.class_id = class_id
         self.class_name_dict = class_name_dict
-        for id in self.class_id:
-            self.in_count_dict[self.class_name_dict[id]] = 0
-            self.out_count_dict[self.class_name_dict[id]] = 0
-        
-        for i in range(len(self.start_points)):
-            self.in_count_dict_batch.append(self.in_count_dict.copy())
-            self.out_count_dict_batch.append(self.out_count_dict.copy())
-            self.tracker_state_batch.append(self.tracker_state.copy())
-            
 
-    def update(self, detections: Detections):
+        # count columns follow the order of class_id
+        self.class_to_idx: Dict[int, int] = {id: k for k, id in enumerate(self.class_id)}
+        self.class_names = [self.class_name_dict[id] for id in self.class_id]
+        # classes outside class_id are tracked but counted in one extra column that is never read
+        self._unknown_class_idx = len(self.class_id)
+        # counts[shard, side] with side 0 = out, 1 = in, so a crossing picks its counter by index,
+        # class columns are padded so that every shard starts on its own cache line
+        n_columns = -(-(len(self.class_id) + 1) * 4 // CACHE_LINE_SIZE) * CACHE_LINE_SIZE // 4
+        self._count_shards = _aligned_zeros((n_shards, 2, len(self.vector_batch), n_columns), np.int32)
+        self._shards = [
+            _LineCounterShard(len(self.vector_batch), self._count_shards[k]) for k in range(n_shards)
+        ]
+        self.tracker_line = self._shards[0].tracker_line
+
+        # the counting path only reads the line normals nx, ny and offsets c of shape (L,) so the
+        # side test runs for all lines at once, a point is in (Vector.is_in) when nx * x + ny * y > c.
+        # Endpoints are whole pixels, truncated like the drawn line, so nx and ny are exact int32,
+        # c is a product of coordinates that overflows int32 past ~46k px and is kept in int64,
+        # and the test against float32 anchors is exact in float64
+        (sx, sy), (ex, ey) = (
+            np.array([p.as_xy_int_tuple() for p in points], dtype=np.int64).reshape(-1, 2).T
+            for points in (self.start_points, self.end_points)
+        )
+        normals = np.stack([ey - sy, sx - ex])
+        if np.abs(normals).max(initial=0) > np.iinfo(np.int32).max:
+            raise ValueError("line endpoints must be pixel coordinates within the int32 range")
+        self._line_normals = normals.astype(np.int32)
+        self._line_offsets = normals[0] * sx + normals[1] * sy
+
+        # drawing geometry never changes once the lines are set
+        self._starts_xy = [v.start.as_xy_int_tuple() for v in self.vector_batch]
+        self._ends_xy = [v.end.as_xy_int_tuple() for v in self.vector_batch]
+        self._xy_sums = [(v.start.x + v.end.x, v.start.y + v.end.y) for v in self.vector_batch]
+        self._segments = np.array(
+            [[s, e] for s, e in zip(self._starts_xy, self._ends_xy)], dtype=np.int32
+        ).reshape(len(self.vector_batch), 2, 2)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """
+        (2, L, C) out (0) and in (1) counts of every line, summed over all shards.
+        """
+        return self._count_shards[..., :len(self.class_id)].sum(axis=0, dtype=np.int32)
+
+    @property
+    def in_counts(self) -> np.ndarray:
+        return self.counts[1]
+
+    @property
+    def out_counts(self) -> np.ndarray:
+        return self.counts[0]
+
+    @property
+    def in_count_dict_batch(self) -> List[Dict[str, int]]:
+        """
+        Per line {class name: in count} dicts, rebuilt from the count arrays on every access.
+        """
+        return [dict(zip(self.class_names, counts)) for counts in self.in_counts.tolist()]
+
+    @property
+    def out_count_dict_batch(self) -> List[Dict[str, int]]:
+        """
+        Per line {class name: out count} dicts, rebuilt from the count arrays on every access.
+        """
+        return [dict(zip(self.class_names, counts)) for counts in self.out_counts.tolist()]
+
+    @property
+    def tracker_line_shards(self) -> List[Dict[int, List[int]]]:
+        return [shard.tracker_line for shard in self._shards]
+
+    def reset(self):
+        """
+        Forget all trackers and set every count back to zero, e.g. between video clips.
+        """
+        self._count_shards.fill(0)
+        for shard in self._shards:
+            shard.reset()
+
+    def update(self, detections: Detections, shard_id: int = 0):
         """
         Update the in_count and out_count for the detections that cross the line.
 
+        Every shard has its own tracker state and counters, so streams updating
+        different shards from different threads never write to shared memory.
+
         :param detections: Detections : The detections for which to update the counts.
+        :param shard_id: int : The shard of the calling stream, in range(n_shards).
         """
-        for xyxy, confidence, class_id, tracker_id in detections:
-            
-            # handle detections with no tracker_id
-            if tracker_id is None:
-                continue
-
-            # we check if all four anchors of bbox are on the same side of vector
-            x1, y1, x2, y2 = xyxy
-            anchors = [
-                Point(x=x1, y=y1),
-                Point(x=x1, y=y2),
-                Point(x=x2, y=y1),
-                Point(x=x2, y=y2),
-            ]
-            mean_anchor = Point(x=(x1+x2)/2, y=(y1+y2)/2)
-            triggers_batch = []
-            for i in range(len(self.vector_batch)):
-                # triggers = [self.vector_batch[i].is_in(point=anchor) for anchor in anchors]
-                triggers = self.vector_batch[i].is_in(point=mean_anchor)
-                triggers_batch.append(triggers)
-
-            for id, triggers in enumerate(triggers_batch):
-                # detection is partially in and partially out
-                # if len(set(triggers)) == 2:
-                #     continue
-
-                # tracker_state = triggers[0]
-                tracker_state = triggers
-                # handle new detection, if not in the batch, append it
-                if tracker_id not in self.tracker_state_batch[id]:
-                    self.tracker_state_batch[id][tracker_id] = tracker_state
-                    self.tracker_line[tracker_id] = [class_id]
-                    continue
-
-                # handle detection on the same side of the line
-                if self.tracker_state_batch[id].get(tracker_id) == tracker_state:
-                    continue
-
-                # If the detection box cross-over the line
-                self.tracker_state_batch[id][tracker_id] = tracker_state
-                # print(self.tracker_state_batch)
-
-                self.tracker_line[tracker_id].append(id)
-                if tracker_state:
-                    self.in_count_dict_batch[id][self.class_name_dict[class_id]] += 1
-                else:
-                    self.out_count_dict_batch[id][self.class_name_dict[class_id]] += 1
-
-            
+        shard = self._shards[shard_id]
+
+        # handle detections with no tracker_id
+        if detections.tracker_id is None:
+            return
+        mask = np.not_equal(detections.tracker_id, None)
+        if not mask.any():
+            return
+        xyxy = np.ascontiguousarray(detections.xyxy[mask], dtype=np.float32)
+        # plain int keys, hashing them is cheaper than numpy scalars or strings
+        tracker_ids = detections.tracker_id[mask].astype(np.int64).tolist()
+        class_ids = detections.class_id[mask].tolist()
+
+        # the mean anchor of every bbox, shape (N,)
+        cx = (xyxy[:, 0] + xyxy[:, 2]) * 0.5
+        cy = (xyxy[:, 1] + xyxy[:, 3]) * 0.5
+
+        assign_slot = shard.assign_slot
+        slots = np.array([assign_slot(tid) for tid in tracker_ids], dtype=np.int64)
+        class_idx, unknown = self.class_to_idx.get, self._unknown_class_idx
+        cls_idx = np.array([class_idx(id, unknown) for id in class_ids], dtype=np.int64)
+
+        # handle new detection, its side of every line is only remembered
+        is_new = ~shard.seen[slots]
+        for i in np.flatnonzero(is_new):
+            shard.tracker_line[tracker_ids[i]] = [class_ids[i]]
+        shard.seen[slots] = True
+
+        if HAS_NUMBA:
+            crossed = np.empty((len(slots), len(self.vector_batch)), dtype=np.bool_)
+            _update_kernel(
+                cx, cy, slots, cls_idx, is_new,
+                *self._line_normals, self._line_offsets,
+                shard.state, shard.counts, crossed,
+            )
+            crossings = zip(*np.nonzero(crossed))
+        else:
+            crossings = zip(*np.nonzero(self._update_lines(shard, cx, cy, slots, cls_idx, is_new)))
+
+        # (N, L) order keeps tracker_line appends per detection, in line order
+        for i, id in crossings:
+            shard.tracker_line[tracker_ids[i]].append(int(id))
+
+    def _update_lines(
+        self,
+        shard: _LineCounterShard,
+        cx: np.ndarray,
+        cy: np.ndarray,
+        slots: np.ndarray,
+        cls_idx: np.ndarray,
+        is_new: np.ndarray,
+    ) -> np.ndarray:
+        """
+        NumPy fallback of _update_kernel, used when numba is not installed.
+
+        :param shard: _LineCounterShard : The tracker state and counters to update.
+        :param cx: np.ndarray : (N,) float32 x of the mean anchors.
+        :param cy: np.ndarray : (N,) float32 y of the mean anchors.
+        :param slots: np.ndarray : (N,) tracker slot of each detection.
+        :param cls_idx: np.ndarray : (N,) count column of each detection.
+        :param is_new: np.ndarray : (N,) True for trackers seen for the first time.
+        :return: np.ndarray : (N, L) True where a detection crossed a line.
+        """
+        # side test of all lines x all anchors, same rule as Vector.is_in, shape (L, N)
+        nx, ny = self._line_normals[:, :, None]
+        c = self._line_offsets[:, None]
+        new_state = nx * cx + ny * cy > c
+
+        # flip the state bit of every (line, tracker) whose side changed
+        words = slots >> 6
+        bits = np.left_shift(np.uint64(1), (slots & 63).astype(np.uint64))
+        flipped = ((shard.state[:, words] & bits) != 0) ^ new_state
+        line_idx, det_idx = np.nonzero(flipped)
+        np.bitwise_xor.at(shard.state, (line_idx, words[det_idx]), bits[det_idx])
+
+        # detection boxes that cross-over a line since the last frame
+        changed = flipped & ~is_new[None, :]
+        line_idx, det_idx = np.nonzero(changed)
+        np.add.at(shard.counts, (new_state[line_idx, det_idx].view(np.uint8), line_idx, cls_idx[det_idx]), 1)
+        return changed.T
 
 
 class LineCounterAnnotator:
@@ -130,18 +310,100 @@ class LineCounterAnnotator:
         self.text_offset: float = text_offset
         self.text_padding: int = text_padding
         self.color_batch = [Color.white(), Color.red(), Color.green(), Color.blue()]
+        self._bgr_batch = [color.as_bgr() for color in self.color_batch]
+        self._text_bgr = self.text_color.as_bgr()
+        # reused buffer for the pieces of a label
+        self._text_parts: List[str] = []
+        # last label and its layout per line, recomputed only when the label changes
+        self._last_in_key: Dict[int, tuple] = {}
+        self._last_in_layout: Dict[int, tuple] = {}
+        self._last_out_key: Dict[int, tuple] = {}
+        self._last_out_layout: Dict[int, tuple] = {}
+        # rendered label pixels of the last annotate call, in drawing order, valid for _overlay_key
+        self._overlay_cache: List[Tuple[Tuple[slice, slice], np.ndarray]] = []
+        self._overlay_key: Optional[tuple] = None
+        self._overlay_owner: Optional[LineCounter] = None
 
     def result(self, line_counter: LineCounter):
         result_batch = []
+        out_counts, in_counts = line_counter.counts
         for i in range(len(line_counter.vector_batch)):
-            in_dict = dict()
-            out_dict = dict()
-            for id in line_counter.in_count_dict_batch[i]:
-                in_dict[id] = line_counter.in_count_dict_batch[i][id]
-                out_dict[id] = line_counter.out_count_dict_batch[i][id]
+            in_dict = dict(zip(line_counter.class_names, in_counts[i].tolist()))
+            out_dict = dict(zip(line_counter.class_names, out_counts[i].tolist()))
             result_batch.append([in_dict, out_dict])
         return result_batch
 
+    def _format_text(self, prefix: str, class_names: List[str], counts: np.ndarray) -> str:
+        """
+        Build a label such as "# 0, (in) car : 3 bus : 1 " in a single join.
+
+        :param prefix: str : The line index and direction part of the label.
+        :param class_names: List[str] : The class names, in count column order.
+        :param counts: np.ndarray : (C,) counts of one line and direction.
+        :return: str : The label to be drawn.
+        """
+        parts = self._text_parts
+        parts.clear()
+        parts.append(prefix)
+        for id, count in zip(class_names, counts.tolist()):
+            parts.append(f"{id} : {count} ")
+        return "".join(parts)
+
+    def _text_layout(
+        self,
+        last_key: Dict[int, tuple],
+        last_layout: Dict[int, tuple],
+        i: int,
+        text: str,
+        xy_sum: Tuple[float, float],
+        direction: float,
+    ) -> tuple:
+        """
+        Position of a label centered on a line, reused while the label does not change.
+
+        :param last_key: dict : The (label, line) key the cached layout was computed for, per line.
+        :param last_layout: dict : The cached layout per line.
+        :param i: int : The index of the line.
+        :param text: str : The label to be drawn.
+        :param xy_sum: tuple : The sum of the start and end point of the line.
+        :param direction: float : -1 to place the label above the line, 1 below it.
+        :return: tuple : The text origin, the top left / bottom right of its background and
+            whether all text pixels fall inside that opaque background.
+        """
+        key = (text, xy_sum)
+        if last_key.get(i) == key:
+            return last_layout[i]
+
+        (text_width, text_height), baseline = cv2.getTextSize(
+            text, cv2.FONT_HERSHEY_SIMPLEX, self.text_scale, self.text_thickness
+        )
+        text_x = int((xy_sum[0] - text_width) / 2)
+        text_y = int((xy_sum[1] + text_height) / 2 + direction * self.text_offset * text_height)
+        text_background_rect = Rect(
+            x=text_x,
+            y=text_y - text_height,
+            width=text_width,
+            height=text_height,
+        ).pad(padding=self.text_padding)
+
+        rect_top_left = text_background_rect.top_left.as_xy_int_tuple()
+        rect_bottom_right = text_background_rect.bottom_right.as_xy_int_tuple()
+
+        # putText strokes reach up to text_thickness past the box of getTextSize, descenders
+        # and parentheses go down to the baseline
+        thickness = int(self.text_thickness)
+        fits_background = (
+            rect_top_left[0] <= text_x - thickness
+            and rect_top_left[1] <= text_y - text_height - thickness
+            and rect_bottom_right[0] >= text_x + text_width - 1 + thickness
+            and rect_bottom_right[1] >= text_y + baseline - 1 + thickness
+        )
+
+        layout = ((text_x, text_y), rect_top_left, rect_bottom_right, fits_background)
+        last_key[i] = key
+        last_layout[i] = layout
+        return layout
+
     def annotate(self, frame: np.ndarray, line_counter: LineCounter) -> np.ndarray:
         """
         Draws the line on the frame using the line_counter provided.
@@ -151,122 +413,94 @@ class LineCounterAnnotator:
         :return: np.ndarray : The image with the line drawn on it
         """
 
-        for i in range(len(line_counter.vector_batch)):
-            cv2.line(
+        n_lines = len(line_counter.vector_batch)
+
+        # one polylines call per line color instead of one cv2.line per line
+        color_groups: Dict[tuple, List[int]] = {}
+        for i in range(n_lines):
+            color_groups.setdefault(self._bgr_batch[i], []).append(i)
+        for line_bgr, idx in color_groups.items():
+            cv2.polylines(
                 frame,
-                line_counter.vector_batch[i].start.as_xy_int_tuple(),
-                line_counter.vector_batch[i].end.as_xy_int_tuple(),
-                self.color_batch[i].as_bgr(),
+                line_counter._segments[idx],
+                False,
+                line_bgr,
                 self.thickness,
-                lineType=cv2.LINE_AA,
-                shift=0,
-            )
-            cv2.circle(
-                frame,
-                line_counter.vector_batch[i].start.as_xy_int_tuple(),
-                radius=5,
-                color=self.text_color.as_bgr(),
-                thickness=-1,
-                lineType=cv2.LINE_AA,
+                cv2.LINE_AA,
             )
+        for center in line_counter._starts_xy + line_counter._ends_xy:
             cv2.circle(
                 frame,
-                line_counter.vector_batch[i].end.as_xy_int_tuple(),
+                center,
                 radius=5,
-                color=self.text_color.as_bgr(),
+                color=self._text_bgr,
                 thickness=-1,
                 lineType=cv2.LINE_AA,
             )
-        
-            in_text_result = f"# {i}, (in) "
-            out_text_result = f"# {i}, (out) "
 
-            for id in line_counter.in_count_dict_batch[i]:
-                in_text = f"{id} : {line_counter.in_count_dict_batch[i][id]} "
-                in_text_result += in_text
+        # labels are opaque boxes, so while the counts do not change they are copied
+        # from the last rendered frame instead of being drawn again. Labels whose text
+        # spills out of the box are blended with the frame and are never cached
+        counts = line_counter.counts
+        key = (counts.tobytes(), frame.shape)
+        if self._overlay_owner is line_counter and self._overlay_key == key:
+            for region, patch in self._overlay_cache:
+                frame[region] = patch
+            return
 
-            for id in line_counter.out_count_dict_batch[i]:
-                out_text = f"{id} : {line_counter.out_count_dict_batch[i][id]} "
-                out_text_result += out_text
+        self._overlay_cache = []
+        cacheable = True
+        out_counts, in_counts = counts
+        for i in range(n_lines):
+            line_bgr = self._bgr_batch[i]
 
             # in_text = f"in: {line_counter.in_count}"
             # out_text = f"out: {line_counter.out_count}"
 
-            in_text = in_text_result
-            out_text = out_text_result
-
-            (in_text_width, in_text_height), _ = cv2.getTextSize(
-                in_text, cv2.FONT_HERSHEY_SIMPLEX, self.text_scale, self.text_thickness
-            )
-            (out_text_width, out_text_height), _ = cv2.getTextSize(
-                out_text, cv2.FONT_HERSHEY_SIMPLEX, self.text_scale, self.text_thickness
-            )
+            in_text = self._format_text(f"# {i}, (in) ", line_counter.class_names, in_counts[i])
+            out_text = self._format_text(f"# {i}, (out) ", line_counter.class_names, out_counts[i])
 
-            in_text_x = int(
-                (line_counter.vector_batch[i].end.x + line_counter.vector_batch[i].start.x - in_text_width)
-                / 2
+            in_text_xy, in_rect_top_left, in_rect_bottom_right, in_fits = self._text_layout(
+                self._last_in_key, self._last_in_layout, i, in_text, line_counter._xy_sums[i], -1
             )
-            in_text_y = int(
-                (line_counter.vector_batch[i].end.y + line_counter.vector_batch[i].start.y + in_text_height)
-                / 2
-                - self.text_offset * in_text_height
+            out_text_xy, out_rect_top_left, out_rect_bottom_right, out_fits = self._text_layout(
+                self._last_out_key, self._last_out_layout, i, out_text, line_counter._xy_sums[i], 1
             )
+            cacheable = cacheable and in_fits and out_fits
 
-            out_text_x = int(
-                (line_counter.vector_batch[i].end.x + line_counter.vector_batch[i].start.x - out_text_width)
-                / 2
-            )
-            out_text_y = int(
-                (line_counter.vector_batch[i].end.y + line_counter.vector_batch[i].start.y + out_text_height)
-                / 2
-                + self.text_offset * out_text_height
-            )
-
-            in_text_background_rect = Rect(
-                x=in_text_x,
-                y=in_text_y - in_text_height,
-                width=in_text_width,
-                height=in_text_height,
-            ).pad(padding=self.text_padding)
-            out_text_background_rect = Rect(
-                x=out_text_x,
-                y=out_text_y - out_text_height,
-                width=out_text_width,
-                height=out_text_height,
-            ).pad(padding=self.text_padding)
-
-            cv2.rectangle(
-                frame,
-                in_text_background_rect.top_left.as_xy_int_tuple(),
-                in_text_background_rect.bottom_right.as_xy_int_tuple(),
-                self.color_batch[i].as_bgr(),
-                -1,
-            )
-            cv2.rectangle(
-                frame,
-                out_text_background_rect.top_left.as_xy_int_tuple(),
-                out_text_background_rect.bottom_right.as_xy_int_tuple(),
-                self.color_batch[i].as_bgr(),
-                -1,
-            )
+            cv2.rectangle(frame, in_rect_top_left, in_rect_bottom_right, line_bgr, -1)
+            cv2.rectangle(frame, out_rect_top_left, out_rect_bottom_right, line_bgr, -1)
 
             cv2.putText(
                 frame,
                 in_text,
-                (in_text_x, in_text_y),
+                in_text_xy,
                 cv2.FONT_HERSHEY_SIMPLEX,
                 self.text_scale,
-                self.text_color.as_bgr(),
+                self._text_bgr,
                 self.text_thickness,
                 cv2.LINE_AA,
             )
             cv2.putText(
                 frame,
                 out_text,
-                (out_text_x, out_text_y),
+                out_text_xy,
                 cv2.FONT_HERSHEY_SIMPLEX,
                 self.text_scale,
-                self.text_color.as_bgr(),
+                self._text_bgr,
                 self.text_thickness,
                 cv2.LINE_AA,
             )
+
+            for top_left, bottom_right in (
+                (in_rect_top_left, in_rect_bottom_right),
+                (out_rect_top_left, out_rect_bottom_right),
+            ):
+                region = (
+                    slice(max(top_left[1], 0), max(bottom_right[1] + 1, 0)),
+                    slice(max(top_left[0], 0), max(bottom_right[0] + 1, 0)),
+                )
+                self._overlay_cache.append((region, frame[region].copy()))
+
+        self._overlay_key = key if cacheable else None
+        self._overlay_owner = line_counter